@@ -21,6 +21,27 @@ import whisper
 from pydub import AudioSegment
 import tempfile
 import time
+import struct
+
+def wav_header(sample_rate, sample_width, data_size, channels=1):
+    """產生44位元組的PCM WAV檔頭（RIFF/fmt/data），之後直接接上原始音訊資料"""
+    byte_rate = sample_rate * channels * sample_width
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 36 + data_size, b'WAVE',
+        b'fmt ', 16, 1, channels, sample_rate, byte_rate, channels * sample_width, sample_width * 8,
+        b'data', data_size
+    )
+
+def write_wav_file(file_path, audio_data):
+    """將AudioData寫成WAV檔：先寫檔頭再直接寫入frame_data，不另外組出整個WAV位元組"""
+    with open(file_path, "wb") as f:
+        if audio_data.sample_width == 1:
+            # 8位元WAV為無號數，需由speech_recognition轉換
+            f.write(audio_data.get_wav_data())
+            return
+        f.write(wav_header(audio_data.sample_rate, audio_data.sample_width, len(audio_data.frame_data)))
+        f.write(audio_data.frame_data)
 
 class ImprovedSpeechToTextApp:
     def __init__(self, root):
@@ -32,10 +53,13 @@ class ImprovedSpeechToTextApp:
         self.is_recording = False
         self.audio_data = None
         self.recognizer = sr.Recognizer()
+        self.recognizer.operation_timeout = 15  # Google識別請求逾時（秒），避免網路異常時轉換無限期等待
         self.microphone = None
         self.whisper_model = None
         self.recording_segments = []
         self.recording_start_time = None
+        self.ambient_calibrated = False  # 是否已校準環境噪音
+        self.energy_threshold = None  # 校準後的能量門檻，之後錄音直接沿用
         
         # 初始化麥克風
         self.init_microphone()
@@ -49,14 +73,25 @@ class ImprovedSpeechToTextApp:
     def init_microphone(self):
         """初始化麥克風"""
         try:
-            self.microphone = sr.Microphone()
+            self.microphone = sr.Microphone(sample_rate=16000, chunk_size=1024)  # 直接以Whisper使用的16kHz擷取
             with self.microphone as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=1)
+                self.calibrate_ambient_noise(source)
             print("麥克風已就緒")
         except Exception as e:
             print(f"麥克風初始化失敗: {e}")
             self.microphone = None
     
+    def calibrate_ambient_noise(self, source, duration=1):
+        """聆聽環境噪音並記下能量門檻，之後的錄音直接沿用"""
+        self.recognizer.adjust_for_ambient_noise(source, duration=duration)
+        self.energy_threshold = self.recognizer.energy_threshold
+        self.ambient_calibrated = True
+    
+    def recalibrate_microphone(self):
+        """下次錄音時重新校準環境噪音（更換環境時使用）"""
+        self.ambient_calibrated = False
+        self.record_status.config(text="下次錄音時將重新校準麥克風", foreground="blue")
+    
     def load_whisper_model(self):
         """載入Whisper模型（在背景執行）"""
         def load_in_background():
@@ -105,8 +140,12 @@ class ImprovedSpeechToTextApp:
         self.record_status = ttk.Label(control_frame, text="準備錄音")
         self.record_status.grid(row=0, column=1)
         
+        recalibrate_button = ttk.Button(control_frame, text="重新校準麥克風", command=self.recalibrate_microphone)
+        recalibrate_button.grid(row=0, column=2, padx=(15, 0))
+        
         if not self.microphone:
             self.record_button.config(state="disabled")
+            recalibrate_button.config(state="disabled")
             self.record_status.config(text="麥克風不可用", foreground="red")
         
         # 錄音模式選擇
@@ -230,8 +269,12 @@ class ImprovedSpeechToTextApp:
             self.recording_segments = []
             self.recording_start_time = time.time()
             
-            with self.microphone as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=1)
+            if self.ambient_calibrated:
+                # 沿用先前校準的門檻，不必每次先花1秒聆聽環境噪音
+                self.recognizer.energy_threshold = self.energy_threshold
+            else:
+                with self.microphone as source:
+                    self.calibrate_ambient_noise(source)
             
             if self.record_mode_var.get() == "continuous":
                 self.continuous_recording()
@@ -299,6 +342,12 @@ class ImprovedSpeechToTextApp:
             self.root.after(0, lambda: self.record_status.config(text="錄音超時", foreground="orange"))
             self.root.after(0, self.stop_recording)
     
+    def reserve_temp_file(self, suffix=".wav"):
+        """建立臨時檔案並立即關閉檔案描述符，只回傳路徑（避免Windows上以路徑寫入時被佔用）"""
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        os.close(fd)
+        return path
+    
     def merge_audio_segments(self):
         """合併多個錄音段落"""
         try:
@@ -314,10 +363,9 @@ class ImprovedSpeechToTextApp:
             temp_files = []
             
             for i, segment in enumerate(self.recording_segments):
-                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=f"_segment_{i}.wav")
-                with open(temp_file.name, "wb") as f:
-                    f.write(segment.get_wav_data())
-                temp_files.append(temp_file.name)
+                temp_file = self.reserve_temp_file(f"_segment_{i}.wav")
+                write_wav_file(temp_file, segment)
+                temp_files.append(temp_file)
             
             # 使用pydub合併音訊
             combined = AudioSegment.empty()
@@ -328,11 +376,11 @@ class ImprovedSpeechToTextApp:
                 combined += AudioSegment.silent(duration=200)  # 200ms間隔
             
             # 保存合併結果
-            final_temp = tempfile.NamedTemporaryFile(delete=False, suffix="_combined.wav")
-            combined.export(final_temp.name, format="wav")
+            final_temp = self.reserve_temp_file("_combined.wav")
+            combined.export(final_temp, format="wav")
             
             # 載入合併後的音訊
-            with sr.AudioFile(final_temp.name) as source:
+            with sr.AudioFile(final_temp) as source:
                 self.audio_data = self.recognizer.record(source)
             
             # 清理臨時文件
@@ -342,7 +390,7 @@ class ImprovedSpeechToTextApp:
                 except:
                     pass
             try:
-                os.unlink(final_temp.name)
+                os.unlink(final_temp)
             except:
                 pass
             
@@ -384,15 +432,15 @@ class ImprovedSpeechToTextApp:
                         audio = AudioSegment.from_file(file_path)
                         
                         # 創建臨時WAV檔案
-                        temp_wav = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-                        audio.export(temp_wav.name, format="wav")
+                        temp_wav = self.reserve_temp_file()
+                        audio.export(temp_wav, format="wav")
                         
                         # 載入轉換後的檔案
-                        with sr.AudioFile(temp_wav.name) as source:
+                        with sr.AudioFile(temp_wav) as source:
                             self.audio_data = self.recognizer.record(source)
                         
                         # 清理臨時檔案
-                        os.unlink(temp_wav.name)
+                        os.unlink(temp_wav)
                         
                     else:
                         # 直接載入WAV檔案
@@ -429,7 +477,7 @@ class ImprovedSpeechToTextApp:
         self.text_result.insert(tk.END, f"語言設定：{self.language_var.get()}\n\n")
         
         self.convert_button.config(state="disabled", text="轉換中...")
-        self.root.update()
+        self.text_result.update_idletasks()
         
         # 在新線程中執行轉換
         threading.Thread(target=self.perform_conversion, daemon=True).start()
@@ -453,22 +501,21 @@ class ImprovedSpeechToTextApp:
                     raise Exception("Whisper模型未載入")
                 
                 # 將AudioData轉換為臨時檔案
-                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-                with open(temp_file.name, "wb") as f:
-                    f.write(self.audio_data.get_wav_data())
+                temp_file = self.reserve_temp_file()
+                write_wav_file(temp_file, self.audio_data)
                 
                 # 使用Whisper轉換
                 if language == "auto":
-                    result = self.whisper_model.transcribe(temp_file.name)
+                    result = self.whisper_model.transcribe(temp_file)
                 elif language == "zh-TW":
-                    result = self.whisper_model.transcribe(temp_file.name, language="zh")
+                    result = self.whisper_model.transcribe(temp_file, language="zh")
                 else:
-                    result = self.whisper_model.transcribe(temp_file.name, language="en")
+                    result = self.whisper_model.transcribe(temp_file, language="en")
                 
                 text = result["text"]
                 
                 # 清理臨時檔案
-                os.unlink(temp_file.name)
+                os.unlink(temp_file)
             
             # 在主線程中更新UI
             self.root.after(0, lambda: self.show_result(text, True))
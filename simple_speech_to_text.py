@@ -20,7 +20,10 @@ class SimpleSpeechToTextApp:
         
         # 初始化變數
         self.recognizer = sr.Recognizer()
+        self.recognizer.operation_timeout = 15  # Google識別請求逾時（秒），避免網路異常時轉換無限期等待
         self.audio_data = None
+        self.ambient_calibrated = False  # 是否已校準環境噪音
+        self.energy_threshold = None  # 校準後的能量門檻，之後錄音直接沿用
         
         # 建立UI
         self.create_widgets()
@@ -29,7 +32,7 @@ class SimpleSpeechToTextApp:
         try:
             self.microphone = sr.Microphone()
             with self.microphone as source:
-                self.recognizer.adjust_for_ambient_noise(source)
+                self.calibrate_ambient_noise(source)
             self.mic_available = True
         except Exception as e:
             print(f"麥克風初始化失敗: {e}")
@@ -55,6 +58,8 @@ class SimpleSpeechToTextApp:
             
             self.record_status = ttk.Label(record_frame, text="準備錄音")
             self.record_status.grid(row=0, column=1)
+            
+            ttk.Button(record_frame, text="重新校準麥克風", command=self.recalibrate_microphone).grid(row=0, column=2, padx=(10, 0))
         
         # 檔案上傳區域
         upload_frame = ttk.LabelFrame(main_frame, text="音訊檔案上傳", padding="10")
@@ -112,7 +117,11 @@ class SimpleSpeechToTextApp:
         def record():
             try:
                 with self.microphone as source:
-                    self.recognizer.adjust_for_ambient_noise(source)
+                    if self.ambient_calibrated:
+                        # 沿用先前校準的門檻，不必每次先聆聽環境噪音
+                        self.recognizer.energy_threshold = self.energy_threshold
+                    else:
+                        self.calibrate_ambient_noise(source)
                     audio = self.recognizer.listen(source, timeout=10, phrase_time_limit=10)
                     self.audio_data = audio
                     self.root.after(0, lambda: self.record_status.config(text="錄音完成"))
@@ -126,6 +135,17 @@ class SimpleSpeechToTextApp:
         
         threading.Thread(target=record, daemon=True).start()
     
+    def calibrate_ambient_noise(self, source):
+        """聆聽環境噪音並記下能量門檻，之後的錄音直接沿用"""
+        self.recognizer.adjust_for_ambient_noise(source)
+        self.energy_threshold = self.recognizer.energy_threshold
+        self.ambient_calibrated = True
+    
+    def recalibrate_microphone(self):
+        """下次錄音時重新校準環境噪音（更換環境時使用）"""
+        self.ambient_calibrated = False
+        self.record_status.config(text="下次錄音時將重新校準麥克風")
+    
     def upload_audio_file(self):
         """上傳音訊檔案"""
         file_path = filedialog.askopenfilename(
@@ -154,7 +174,7 @@ class SimpleSpeechToTextApp:
         
         self.text_result.delete(1.0, tk.END)
         self.text_result.insert(tk.END, "正在轉換中，請稍候...\n")
-        self.root.update()
+        self.text_result.update_idletasks()
         
         def convert():
             try:
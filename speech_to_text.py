@@ -18,10 +18,136 @@ import threading
 import os
 from datetime import datetime
 from docx import Document
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
 import whisper
 from pydub import AudioSegment
-import tempfile
+from pydub.utils import mediainfo
 import time
+import subprocess
+import logging
+import concurrent.futures
+import queue
+from dataclasses import dataclass
+from typing import Optional
+import re
+import hashlib
+import numpy as np
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+# torch.compile 於 torch 2.1 之後才足夠穩定
+TORCH_COMPILE_AVAILABLE = bool(
+    torch and tuple(map(int, re.match(r'(\d+)\.(\d+)', torch.__version__).groups())) >= (2, 1)
+)
+
+try:
+    from faster_whisper import WhisperModel
+except ImportError:
+    WhisperModel = None
+
+try:
+    from faster_whisper import BatchedInferencePipeline  # faster-whisper 1.1以上才提供
+except ImportError:
+    BatchedInferencePipeline = None
+
+try:
+    import soundfile as sf
+except ImportError:
+    sf = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+logger = logging.getLogger("stt")
+
+# 需經ffmpeg解碼的音訊格式（其餘格式由speech_recognition直接讀取）
+FFMPEG_AUDIO_EXTENSIONS = ('.mp3', '.mp4', '.m4a', '.flac', '.aac', '.ogg')
+
+# 安裝soundfile時可在程序內直接解碼的格式（僅限16kHz單聲道，其餘仍由ffmpeg重新取樣），不必啟動ffmpeg
+SOUNDFILE_AUDIO_EXTENSIONS = ('.flac', '.ogg')
+
+# 檔案數量超過此值時，檔案列表只建立可見範圍的列
+VIRTUAL_LIST_THRESHOLD = 500
+
+# 快速模式：30秒內的中英文短音訊改用較小的模型，降低延遲
+FAST_WHISPER_MODEL = "tiny"
+FAST_MODE_LANGUAGES = ('zh', 'en')
+
+# 背景執行緒的狀態與結果更新合併後套用到介面的間隔（毫秒，約30Hz）
+UI_FLUSH_INTERVAL_MS = 33
+
+# 句子分割（支援中英文標點）與語速估算用的字詞比對（中文單字或英文單詞），預先編譯避免每次呼叫重新編譯
+SENTENCE_SPLIT_RE = re.compile(r'[。！？；.!?;]\s*')
+SPEECH_TOKEN_RE = re.compile(r'[\u4e00-\u9fff]|[A-Za-z]+')
+
+# Whisper一次處理的音訊長度（30秒），超過時改以批次管線分段平行推論
+WHISPER_WINDOW_SAMPLES = 30 * 16000
+
+# 靜音判定的RMS門檻（float32音訊，約-40dBFS）
+SILENCE_RMS_THRESHOLD = 0.01
+
+def _rms_frames_loop(x, frame, hop):
+    """逐幀計算RMS（供Numba編譯）"""
+    n_frames = max(0, (len(x) - frame) // hop + 1)
+    out = np.empty(n_frames, dtype=np.float32)
+    for i in range(n_frames):
+        start = i * hop
+        acc = 0.0
+        for j in range(start, start + frame):
+            acc += x[j] * x[j]
+        out[i] = np.sqrt(acc / frame)
+    return out
+
+def _rms_frames_numpy(x, frame, hop):
+    """逐幀計算RMS（未安裝Numba時的向量化版本）"""
+    if len(x) < frame:
+        return np.empty(0, dtype=np.float32)
+    windows = np.lib.stride_tricks.sliding_window_view(x, frame)[::hop]
+    return np.sqrt(np.mean(windows * windows, axis=1)).astype(np.float32)
+
+if njit is not None:
+    _rms_frames = njit(cache=True, fastmath=True)(_rms_frames_loop)
+else:
+    _rms_frames = _rms_frames_numpy
+
+def remove_long_silences(audio, sample_rate=16000, max_silence=1.0, frame_ms=30):
+    """將超過max_silence秒的靜音縮短為max_silence秒，減少送進Whisper的音訊長度"""
+    frame = int(sample_rate * frame_ms / 1000)
+    rms = _rms_frames(audio, frame, frame)
+    if len(rms) == 0:
+        return audio
+    
+    # 門檻隨錄音音量調整，避免音量偏小的錄音整段被視為靜音
+    threshold = min(SILENCE_RMS_THRESHOLD, 0.1 * float(rms.max()))
+    silent = rms < threshold
+    
+    # 計算每個靜音幀在連續靜音中的位置，只保留前max_silence秒
+    index = np.arange(len(silent))
+    last_voiced = np.maximum.accumulate(np.where(silent, -1, index))
+    keep = ~silent | (index - last_voiced - 1 < int(max_silence * 1000 / frame_ms))
+    if keep.all():
+        return audio
+    
+    # 最後不足一幀的樣本一律保留
+    mask = np.ones(len(audio), dtype=bool)
+    mask[:len(keep) * frame] = np.repeat(keep, frame)
+    return audio[mask]
+
+@dataclass(frozen=True)
+class RecognitionSettings:
+    """開始轉換時讀取的識別設定，背景線程只使用這份快照而不存取Tk變數"""
+    engine: str
+    language: str
+    enable_timestamps: bool
+    lang_code: Optional[str]  # Whisper使用的語言代碼，自動偵測時為None
+    fast_mode: bool = False  # 短音訊是否改用快速模型
+    batch_size: int = 16  # faster-whisper批次管線一次送進模型的音訊片段數
 
 class SpeechToTextApp:
     def __init__(self, root):
@@ -35,52 +161,281 @@ class SpeechToTextApp:
         self.recording_thread = None  # 錄音線程引用
         self.audio_data = None
         self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
+        self.recognizer.operation_timeout = 15  # Google識別請求逾時（秒），避免網路異常時轉換無限期等待
+        self.microphone = sr.Microphone(sample_rate=16000, chunk_size=1024)  # 直接以Whisper使用的16kHz擷取
         self.whisper_model = None
+        self.whisper_pipeline = None  # faster-whisper批次推論管線（批次轉換時使用）
+        self.whisper_batch_size = 16  # 批次大小的預設值（實際使用的值隨RecognitionSettings傳遞）
+        self.cuda_available = bool(torch and torch.cuda.is_available())
+        self.whisper_device = "cuda" if self.cuda_available else "cpu"  # 目前已載入模型的推論裝置
+        self.requested_device = self.whisper_device  # 最近一次要求載入的裝置（可能仍在背景載入中）
+        self.use_faster_whisper = WhisperModel is not None  # 已安裝faster-whisper時預設使用
+        self.fast_whisper_model = None  # 快速模式使用的小模型（第一次使用時才載入）
+        self.fast_model_lock = threading.Lock()  # 避免多個線程同時載入快速模型
         self.recording_segments = []  # 存儲多段錄音
+        self.live_queue = None  # 連續錄音時待轉換的段落佇列
+        self.live_thread = None  # 錄音期間逐段轉換的背景線程
+        self.live_cancel = None  # 目前逐段轉換工作的取消旗標（threading.Event）
+        self.live_results = []  # 錄音期間的轉換結果 [(文字, segments, 起始秒數, 是否失敗)]
+        self.live_settings = None  # 錄音期間轉換所用的設定（RecognitionSettings）
+        self.live_audio = None  # 已於錄音期間轉換完成的錄音（與audio_data相同時可直接使用結果）
         self.recording_start_time = None
         self.pause_start_time = None  # 暫停開始時間
         self.total_pause_time = 0  # 總暫停時間
-        self.temp_files = []  # 追蹤臨時檔案
-        self.audio_files = []  # 存儲多個音訊檔案的資訊 [{'path': '', 'name': '', 'order': int}]
+        self.ambient_calibrated = False  # 是否已校準環境噪音
+        self.energy_threshold = None  # 校準後的能量門檻，之後錄音直接沿用
+        self.audio_files = self.new_audio_file_table()  # 存儲多個音訊檔案的資訊 {'path': [], 'name': [], 'order': [], 'duration': []}
         self.current_processing_index = 0  # 目前處理的檔案索引
+        self._tree_top = 0  # 虛擬列表模式下，檔案列表第一個可見列的索引
+        self._tree_ids = []  # 檔案列表目前顯示的列ID（依顯示順序）
         self.total_elapsed_time = 0  # 累計時間（秒）
+        # 批次轉換同時處理的檔案數（至少2個，讓後續檔案的ffmpeg解碼與目前檔案的推論重疊）
+        self.batch_workers = max(2, min(4, os.cpu_count() or 1))
+        self.whisper_lock = threading.Lock()  # Whisper模型一次只執行一個轉換
         self.enable_timestamps = False  # 是否啟用時間戳
-        
-        # 載入Whisper模型
-        self.load_whisper_model()
+        self.duration_cache = {}  # 文字雜湊 -> 估算語音長度（秒）
+        self.whisper_future = None  # 背景載入Whisper模型的Future，完成後模型即可使用
+        self.ui_lock = threading.Lock()  # 保護以下待套用的介面更新
+        self.pending_status = None  # 尚未顯示的最新狀態文字
+        self.pending_result = None  # 尚未顯示的完整結果文字（取代整個文字框）
+        self.pending_result_tail = []  # 尚未附加到結果末端的文字片段
         
         # 建立UI
         self.create_widgets()
         
+        # 主線程定時套用背景線程累積的更新（背景線程本身不呼叫after）
+        self.root.after(UI_FLUSH_INTERVAL_MS, self.flush_ui_updates)
+        
+        # 主迴圈開始後才在背景載入並預熱Whisper模型，介面不必等待；第一次以Whisper轉換時才等候載入完成
+        self.update_record_status("正在載入Whisper模型...")
+        self.root.after_idle(self.reload_whisper_model)
+        
         # 調整麥克風
         self.adjust_microphone()
     
-    def load_whisper_model(self):
-        """載入Whisper模型"""
+    def load_whisper_model(self, device=None):
+        """載入Whisper模型（有CUDA時預設使用GPU，已安裝faster-whisper時改用CTranslate2）"""
+        device = device or self.requested_device
         try:
-            print("載入Whisper模型中...")
-            self.whisper_model = whisper.load_model("base")
-            print("Whisper模型載入完成")
+            if self.use_faster_whisper:
+                # CTranslate2以int8權重推論（GPU上int8搭配float16運算）
+                compute_type = "int8_float16" if device == "cuda" else "int8"
+                logger.debug("載入faster-whisper模型中 (%s, %s)...", device, compute_type)
+                model = WhisperModel("base", device=device, compute_type=compute_type)
+                pipeline = BatchedInferencePipeline(model=model) if BatchedInferencePipeline is not None else None
+            else:
+                logger.debug("載入Whisper模型中 (%s)...", device)
+                if device == "cuda":
+                    # 允許FP32矩陣運算使用TF32 Tensor Core（FP16推論以外的部分也能加速）
+                    torch.set_float32_matmul_precision("high")
+                model = whisper.load_model("base", device=device)
+                pipeline = None
+                if device == "cuda" and TORCH_COMPILE_AVAILABLE:
+                    # 編碼器每次輸入形狀固定（30秒的mel），編譯後不會重新編譯；解碼器長度逐步變化，維持原樣
+                    # 不使用CUDA Graph（reduce-overhead）：其狀態綁定線程，而推論在每次轉換新建的線程上執行
+                    model.encoder = torch.compile(model.encoder)
+            
+            # 新模型載入完成後才連同裝置一起切換，進行中的轉換仍以舊模型完成
+            self.whisper_device = device
+            self.whisper_model = model
+            self.whisper_pipeline = pipeline
+            # 裝置或後端改變後，快速模型下次使用時再以新設定載入
+            with self.fast_model_lock:
+                self.fast_whisper_model = None
+            logger.debug("Whisper模型載入完成")
         except Exception as e:
-            print(f"載入Whisper模型失敗: {e}")
+            logger.warning("載入Whisper模型失敗: %s", e)
             self.whisper_model = None
+            self.whisper_pipeline = None
+    
+    def change_whisper_device(self):
+        """切換Whisper推論裝置並在背景重新載入模型"""
+        device = self.device_var.get()
+        # 已以此裝置載入，或正在以此裝置載入中
+        loading = self.whisper_future is not None and not self.whisper_future.done()
+        if device == self.requested_device and (self.whisper_model or loading):
+            return
+        
+        self.update_record_status(f"正在以{device.upper()}重新載入Whisper模型...")
+        self.reload_whisper_model(device)
+    
+    def change_whisper_backend(self):
+        """切換openai-whisper與faster-whisper並在背景重新載入模型"""
+        use_faster_whisper = self.faster_whisper_var.get()
+        if use_faster_whisper == self.use_faster_whisper and self.whisper_model:
+            return
+        
+        self.use_faster_whisper = use_faster_whisper
+        backend = "faster-whisper" if use_faster_whisper else "openai-whisper"
+        self.update_record_status(f"正在以{backend}重新載入Whisper模型...")
+        self.reload_whisper_model()
+    
+    def reload_whisper_model(self, device=None):
+        """在背景載入並預熱Whisper模型，完成後更新狀態（轉換時可等待whisper_future）"""
+        future = concurrent.futures.Future()
+        previous_future = self.whisper_future
+        if device:
+            self.requested_device = device
+        
+        def reload_model():
+            try:
+                # 前一次載入尚未完成時先等待，避免兩個載入同時進行而互相覆寫
+                if previous_future is not None:
+                    previous_future.result()
+                self.load_whisper_model(device)
+                self.warmup_whisper_model()
+                status_text = "Whisper模型已就緒" if self.whisper_model else "Whisper模型載入失敗"
+                self.post_status(status_text)
+            finally:
+                future.set_result(None)
+        
+        self.whisper_future = future
+        threading.Thread(target=reload_model, daemon=True).start()
+    
+    def get_fast_whisper_model(self):
+        """取得快速模式使用的小模型，第一次使用時才載入（載入失敗時回傳None）"""
+        with self.fast_model_lock:
+            if self.fast_whisper_model is None:
+                try:
+                    if self.use_faster_whisper:
+                        compute_type = "int8_float16" if self.whisper_device == "cuda" else "int8"
+                        self.fast_whisper_model = WhisperModel(FAST_WHISPER_MODEL, device=self.whisper_device, compute_type=compute_type)
+                    else:
+                        self.fast_whisper_model = whisper.load_model(FAST_WHISPER_MODEL, device=self.whisper_device)
+                    logger.debug("快速模型載入完成 (%s)", FAST_WHISPER_MODEL)
+                except Exception as e:
+                    logger.warning("載入快速模型失敗，改用一般模型: %s", e)
+            return self.fast_whisper_model
+    
+    def select_whisper_model(self, audio, settings):
+        """快速模式下，30秒內的中英文短音訊改用小模型；其餘情況回傳None表示使用一般模型"""
+        if not settings.fast_mode or settings.lang_code not in FAST_MODE_LANGUAGES:
+            return None
+        if len(audio) >= WHISPER_WINDOW_SAMPLES:
+            return None
+        return self.get_fast_whisper_model()
+    
+    def warmup_whisper_model(self):
+        """以1秒靜音執行一次推論，預先完成CUDA/CTranslate2的初始化與核心選擇，讓第一次轉換不必等待"""
+        model = self.whisper_model
+        if model is None:
+            return
+        
+        dummy = np.zeros(16000, dtype=np.float32)
+        try:
+            with self.whisper_lock:
+                if WhisperModel is not None and isinstance(model, WhisperModel):
+                    # 關閉VAD，否則靜音會被濾掉而不會實際推論
+                    segments, _ = model.transcribe(dummy, language="en", vad_filter=False)
+                    list(segments)
+                else:
+                    use_cuda = model.device.type == "cuda"
+                    if use_cuda:
+                        dummy = torch.from_numpy(dummy).to("cuda")
+                    model.transcribe(dummy, language="en", fp16=use_cuda)
+            logger.debug("Whisper模型預熱完成")
+        except Exception as e:
+            logger.warning("Whisper模型預熱失敗: %s", e)
+            self.restore_uncompiled_encoder(model)
+    
+    def restore_uncompiled_encoder(self, model):
+        """編碼器編譯或執行失敗時改回未編譯的版本，回傳是否有改回"""
+        original_encoder = getattr(getattr(model, "encoder", None), "_orig_mod", None)
+        if original_encoder is None:
+            return False
+        model.encoder = original_encoder
+        return True
+    
+    def audio_data_to_array(self, audio_data):
+        """將AudioData轉換為Whisper使用的16kHz float32陣列"""
+        raw = audio_data.get_raw_data(convert_rate=16000, convert_width=2)
+        return np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+    
+    def transcribe_with_whisper(self, audio, lang_code, word_timestamps=False, batched=False, model=None, batch_size=16):
+        """使用Whisper轉換音訊，回傳openai-whisper格式的結果 {"text", "segments"}（batched時以批次管線一次推論多個片段，指定model時改用該模型）"""
+        if model is None:
+            model = self.whisper_model
+            pipeline = self.whisper_pipeline
+        else:
+            pipeline = None
+        
+        # 超過30秒的音訊由批次管線以VAD在靜音處切成30秒內的片段，多個片段同時推論
+        if (batched or len(audio) > WHISPER_WINDOW_SAMPLES) and pipeline is not None:
+            with self.whisper_lock:
+                # 管線預設不產生時間戳，每個VAD片段只回傳一段；需要時間戳時開啟，保留Whisper原本的分段
+                segments, info = pipeline.transcribe(
+                    audio,
+                    language=lang_code,
+                    word_timestamps=word_timestamps,
+                    without_timestamps=not word_timestamps,
+                    batch_size=batch_size,
+                    beam_size=5
+                )
+                return self.collect_faster_whisper_result(segments, info)
+        
+        if WhisperModel is not None and isinstance(model, WhisperModel):
+            with self.whisper_lock:
+                segments, info = model.transcribe(
+                    audio,
+                    language=lang_code,
+                    word_timestamps=word_timestamps,
+                    vad_filter=True,
+                    beam_size=5
+                )
+                return self.collect_faster_whisper_result(segments, info)
+        
+        # openai-whisper：GPU上以FP16推論，並先把音訊搬到GPU，讓log-mel頻譜也在GPU上計算
+        # 裝置取自這次使用的模型本身，切換裝置重新載入期間進行中的轉換不受影響
+        use_cuda = model.device.type == "cuda"
+        options = {"fp16": use_cuda}
+        if use_cuda:
+            audio = torch.from_numpy(audio).to("cuda")
+        if word_timestamps:
+            options["word_timestamps"] = True
+        if lang_code:
+            options["language"] = lang_code
+        with self.whisper_lock:
+            try:
+                return model.transcribe(audio, **options)
+            except Exception as e:
+                # 編譯過的編碼器失敗時改回未編譯版本再轉換一次
+                if not self.restore_uncompiled_encoder(model):
+                    raise
+                logger.warning("編譯後的編碼器推論失敗，改用未編譯版本: %s", e)
+                return model.transcribe(audio, **options)
+    
+    def collect_faster_whisper_result(self, segments, info):
+        """執行faster-whisper的segments產生器並整理為openai-whisper格式（需在whisper_lock內呼叫）"""
+        # segments為產生器，迭代時才實際推論
+        segments = [{"start": s.start, "end": s.end, "text": s.text} for s in segments]
+        return {"text": "".join(s["text"] for s in segments), "segments": segments, "language": info.language}
     
     def adjust_microphone(self):
         """調整麥克風"""
         try:
             with self.microphone as source:
-                self.recognizer.adjust_for_ambient_noise(source)
-            print("麥克風已調整完成")
+                self.calibrate_ambient_noise(source)
+            logger.debug("麥克風已調整完成")
         except Exception as e:
-            print(f"調整麥克風失敗: {e}")
+            logger.warning("調整麥克風失敗: %s", e)
+    
+    def calibrate_ambient_noise(self, source, duration=1):
+        """聆聽環境噪音並記下能量門檻，之後的錄音直接沿用"""
+        self.recognizer.adjust_for_ambient_noise(source, duration=duration)
+        self.energy_threshold = self.recognizer.energy_threshold
+        self.ambient_calibrated = True
+    
+    def recalibrate_microphone(self):
+        """下次錄音時重新校準環境噪音（更換環境時使用）"""
+        self.ambient_calibrated = False
+        self.update_record_status("下次錄音時將重新校準麥克風")
     
     def update_record_status(self, text):
         """安全地更新錄音狀態"""
         try:
             self.record_status.config(text=text)
         except Exception as e:
-            print(f"更新狀態失敗: {e}")
+            logger.warning("更新狀態失敗: %s", e)
     
     def safe_update_result(self, text):
         """安全地更新結果顯示"""
@@ -88,42 +443,44 @@ class SpeechToTextApp:
             self.text_result.delete(1.0, tk.END)
             self.text_result.insert(tk.END, text)
         except Exception as e:
-            print(f"更新結果失敗: {e}")
+            logger.warning("更新結果失敗: %s", e)
     
-    def safe_file_cleanup(self, file_path, max_retries=3):
-        """安全地清理檔案，包含重試機制"""
-        import time
-        for attempt in range(max_retries):
-            try:
-                if os.path.exists(file_path):
-                    os.unlink(file_path)
-                return True
-            except PermissionError:
-                print(f"檔案清理失敗 (嘗試 {attempt + 1}/{max_retries}): {file_path}")
-                time.sleep(0.5)  # 等待0.5秒後重試
-            except Exception as e:
-                print(f"檔案清理錯誤: {e}")
-                break
-        return False
+    def safe_append_result(self, text):
+        """安全地在結果顯示末端附加文字（只插入新的部分，不重寫整個文字框）"""
+        try:
+            self.text_result.insert(tk.END, text)
+        except Exception as e:
+            logger.warning("更新結果失敗: %s", e)
     
-    def cleanup_temp_files(self):
-        """清理所有追蹤的臨時檔案"""
-        cleaned_files = []
-        failed_files = []
-        
-        for file_path in self.temp_files[:]:  # 使用副本遍歷
-            if self.safe_file_cleanup(file_path):
-                cleaned_files.append(file_path)
-                self.temp_files.remove(file_path)
-            else:
-                failed_files.append(file_path)
-        
-        if cleaned_files:
-            print(f"已清理 {len(cleaned_files)} 個臨時檔案")
-        if failed_files:
-            print(f"無法清理 {len(failed_files)} 個檔案: {failed_files}")
-        
-        return len(failed_files) == 0
+    def post_status(self, text):
+        """從背景執行緒更新狀態（與其他更新合併後才套用到介面）"""
+        with self.ui_lock:
+            self.pending_status = text
+    
+    def post_result(self, text):
+        """從背景執行緒取代整個結果顯示（先前未套用的附加片段一併捨棄）"""
+        with self.ui_lock:
+            self.pending_result = text
+            self.pending_result_tail = []
+    
+    def post_result_append(self, text):
+        """從背景執行緒在結果末端附加文字"""
+        with self.ui_lock:
+            self.pending_result_tail.append(text)
+    
+    def flush_ui_updates(self):
+        """在主線程一次套用累積的狀態與結果更新，並排程下一次（約30Hz）"""
+        with self.ui_lock:
+            status, self.pending_status = self.pending_status, None
+            result, self.pending_result = self.pending_result, None
+            tail, self.pending_result_tail = self.pending_result_tail, []
+        if result is not None:
+            self.safe_update_result(result)
+        if tail:
+            self.safe_append_result("".join(tail))
+        if status is not None:
+            self.update_record_status(status)
+        self.root.after(UI_FLUSH_INTERVAL_MS, self.flush_ui_updates)
     
     def reset_all(self):
         """重置所有狀態和清理資源"""
@@ -141,13 +498,18 @@ class SpeechToTextApp:
             # 清空音訊資料
             self.audio_data = None
             self.recording_segments = []
+            self.stop_live_transcription()
+            self.live_audio = None
             self.recording_start_time = None
-            self.audio_files = []  # 清空音訊檔案列表
+            self.audio_files = self.new_audio_file_table()  # 清空音訊檔案列表
             self.current_processing_index = 0
             self.total_elapsed_time = 0  # 重置累計時間
             
-            # 清理臨時檔案
-            self.cleanup_temp_files()
+            # 捨棄尚未套用的背景更新，避免重置後又顯示舊結果
+            with self.ui_lock:
+                self.pending_status = None
+                self.pending_result = None
+                self.pending_result_tail = []
             
             # 重置UI狀態
             self.root.after(0, self.update_record_status, "已重置")
@@ -158,11 +520,11 @@ class SpeechToTextApp:
             self.root.after(0, lambda: self.clear_audio_files())  # 清空檔案列表
             self.root.after(0, lambda: self.text_result.delete(1.0, tk.END))
             
-            print("系統已重置")
+            logger.debug("系統已重置")
             return True
             
         except Exception as e:
-            print(f"重置失敗: {e}")
+            logger.warning("重置失敗: %s", e)
             return False
     
     def create_widgets(self):
@@ -193,7 +555,9 @@ class SpeechToTextApp:
         self.resume_button.grid(row=0, column=2, padx=(0, 5))
         
         self.stop_button = ttk.Button(button_frame, text="結束錄音", command=self.stop_recording, state="disabled")
-        self.stop_button.grid(row=0, column=3)
+        self.stop_button.grid(row=0, column=3, padx=(0, 5))
+        
+        ttk.Button(button_frame, text="重新校準麥克風", command=self.recalibrate_microphone).grid(row=0, column=4)
         
         self.record_status = ttk.Label(record_frame, text="準備錄音")
         self.record_status.grid(row=1, column=0, columnspan=2, pady=(5, 0))
@@ -242,13 +606,18 @@ class SpeechToTextApp:
         self.file_tree.column("檔案名稱", width=200)
         self.file_tree.column("路徑", width=300)
         
-        # 捲軸
-        file_scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=self.file_tree.yview)
-        self.file_tree.configure(yscrollcommand=file_scrollbar.set)
+        # 捲軸（虛擬列表模式下由程式自行計算位置）
+        self.file_scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=self.scroll_file_list)
+        self.file_tree.configure(yscrollcommand=self.on_file_tree_yscroll)
+        
+        # 滑鼠滾輪（Windows/macOS 與 Linux）
+        self.file_tree.bind("<MouseWheel>", self.on_file_list_mousewheel)
+        self.file_tree.bind("<Button-4>", self.on_file_list_mousewheel)
+        self.file_tree.bind("<Button-5>", self.on_file_list_mousewheel)
         
         # 配置網格
         self.file_tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        file_scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.file_scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
         
         # 順序調整按鈕
         order_frame = ttk.Frame(upload_frame)
@@ -266,6 +635,35 @@ class SpeechToTextApp:
         ttk.Radiobutton(engine_frame, text="Google (需網路)", variable=self.engine_var, value="google").grid(row=0, column=0, padx=(0, 10))
         ttk.Radiobutton(engine_frame, text="Whisper (離線)", variable=self.engine_var, value="whisper").grid(row=0, column=1)
         
+        # Whisper推論裝置（VRAM不足時可改用CPU）
+        ttk.Label(engine_frame, text="推論裝置：").grid(row=1, column=0, sticky=tk.W, pady=(5, 0))
+        self.device_var = tk.StringVar(value=self.whisper_device)
+        ttk.Radiobutton(engine_frame, text="CPU", variable=self.device_var, value="cpu", command=self.change_whisper_device).grid(row=1, column=1, padx=(0, 10), pady=(5, 0))
+        gpu_radio = ttk.Radiobutton(engine_frame, text="GPU (CUDA)", variable=self.device_var, value="cuda", command=self.change_whisper_device)
+        gpu_radio.grid(row=1, column=2, pady=(5, 0))
+        if not self.cuda_available:
+            gpu_radio.config(state="disabled")
+        
+        # Whisper後端（faster-whisper未安裝時只能使用openai-whisper）
+        self.faster_whisper_var = tk.BooleanVar(value=self.use_faster_whisper)
+        faster_whisper_check = ttk.Checkbutton(
+            engine_frame,
+            text="使用faster-whisper加速（CTranslate2 int8）",
+            variable=self.faster_whisper_var,
+            command=self.change_whisper_backend
+        )
+        faster_whisper_check.grid(row=2, column=0, columnspan=3, sticky=tk.W, pady=(5, 0))
+        if WhisperModel is None:
+            faster_whisper_check.config(state="disabled")
+        
+        # 快速模式：短音訊改用小模型
+        self.fast_mode_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            engine_frame,
+            text=f"快速模式（30秒內的中英文短音訊改用{FAST_WHISPER_MODEL}模型）",
+            variable=self.fast_mode_var
+        ).grid(row=3, column=0, columnspan=3, sticky=tk.W, pady=(5, 0))
+        
         # 語言選擇
         lang_frame = ttk.LabelFrame(main_frame, text="語言設定", padding="10")
         lang_frame.grid(row=4, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 10))
@@ -298,6 +696,13 @@ class SpeechToTextApp:
         )
         self.timestamp_info.grid(row=1, column=0, sticky=tk.W, pady=(5, 0))
         
+        # 批次推論大小（faster-whisper批次轉換時使用）
+        batch_size_frame = ttk.Frame(options_frame)
+        batch_size_frame.grid(row=2, column=0, sticky=tk.W, pady=(5, 0))
+        ttk.Label(batch_size_frame, text="批次大小：").grid(row=0, column=0, sticky=tk.W)
+        self.batch_size_var = tk.IntVar(value=self.whisper_batch_size)
+        ttk.Spinbox(batch_size_frame, from_=1, to=32, textvariable=self.batch_size_var, width=5).grid(row=0, column=1, padx=(5, 0))
+        
         # 轉換按鈕
         convert_button = ttk.Button(main_frame, text="開始轉換", command=self.convert_speech_to_text)
         convert_button.grid(row=6, column=0, columnspan=3, pady=(10, 0))
@@ -320,6 +725,10 @@ class SpeechToTextApp:
         reset_button = ttk.Button(export_frame, text="重置系統", command=self.reset_program, style="Reset.TButton")
         reset_button.grid(row=0, column=2)
         
+        # 長時間工作的進度指示（轉換期間持續跑動）
+        self.progress = ttk.Progressbar(main_frame, mode="indeterminate")
+        self.progress.grid(row=9, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(10, 0))
+        
         # 配置樣式
         style = ttk.Style()
         style.configure("Reset.TButton", foreground="red")
@@ -356,6 +765,11 @@ class SpeechToTextApp:
         self.stop_button.config(state="normal")
         self.record_status.config(text="正在錄音...")
         
+        # 連續錄音時，每錄完一段就先在背景轉換（先停止上一次錄音的轉換工作）
+        self.stop_live_transcription()
+        if self.record_mode_var.get() == "continuous":
+            self.start_live_transcription()
+        
         # 在新線程中錄音
         self.recording_thread = threading.Thread(target=self.record_audio, daemon=True)
         self.recording_thread.start()
@@ -373,7 +787,7 @@ class SpeechToTextApp:
         self.resume_button.config(state="normal")
         self.record_status.config(text="錄音已暫停")
         
-        print("錄音已暫停")
+        logger.debug("錄音已暫停")
     
     def resume_recording(self):
         """繼續錄音"""
@@ -392,7 +806,7 @@ class SpeechToTextApp:
         self.resume_button.config(state="disabled")
         self.record_status.config(text="正在錄音...")
         
-        print("錄音已繼續")
+        logger.debug("錄音已繼續")
     
     def stop_recording(self):
         """結束錄音"""
@@ -425,13 +839,17 @@ class SpeechToTextApp:
         else:
             self.record_status.config(text="錄音已結束")
         
-        print("錄音已結束")
+        logger.debug("錄音已結束")
     
     def record_audio(self):
         """錄音函數"""
         try:
-            with self.microphone as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=1)
+            if self.ambient_calibrated:
+                # 沿用先前校準的門檻，不必每次先花1秒聆聽環境噪音
+                self.recognizer.energy_threshold = self.energy_threshold
+            else:
+                with self.microphone as source:
+                    self.calibrate_ambient_noise(source)
             
             if self.record_mode_var.get() == "continuous":
                 # 連續錄音模式
@@ -453,16 +871,16 @@ class SpeechToTextApp:
             else:
                 messagebox.showwarning("重置", "重置過程中遇到一些問題，請檢查終端輸出")
         except Exception as e:
-            print(f"重置程式失敗: {e}")
+            logger.warning("重置程式失敗: %s", e)
             messagebox.showerror("錯誤", f"重置失敗: {e}")
     
     def toggle_timestamp_option(self):
         """切換時間戳選項"""
         self.enable_timestamps = self.timestamp_var.get()
         if self.enable_timestamps:
-            print("已啟用時間戳功能")
+            logger.debug("已啟用時間戳功能")
         else:
-            print("已關閉時間戳功能")
+            logger.debug("已關閉時間戳功能")
     
     def format_timestamp(self, seconds):
         """格式化時間戳"""
@@ -477,17 +895,39 @@ class SpeechToTextApp:
             return f"[{minutes:02d}:{secs:02d}]"
     
     def get_audio_duration(self, file_path):
-        """取得音檔長度（秒）"""
-        try:
-            audio = AudioSegment.from_file(file_path)
-            return len(audio) / 1000.0  # 轉換為秒
-        except Exception as e:
-            print(f"無法取得音檔長度 {file_path}: {e}")
-            return 0
+        """取得音檔長度（秒），只讀取檔頭不解碼，供批次排序使用（可在背景線程呼叫，不存取檔案表）"""
+        duration = None
+        file_ext = os.path.splitext(file_path)[1].lower()
+        if sf is not None and file_ext in SOUNDFILE_AUDIO_EXTENSIONS:
+            try:
+                duration = sf.info(file_path).duration
+            except Exception as e:
+                # libsndfile不支援的編碼（例如OGG內的Opus）與載入時相同，改由ffprobe讀取
+                logger.debug("soundfile無法讀取 %s，改用ffprobe: %s", file_path, e)
+        if duration is None:
+            try:
+                if file_ext in FFMPEG_AUDIO_EXTENSIONS:
+                    # 由ffprobe讀取容器記錄的長度
+                    duration = float(mediainfo(file_path)["duration"])
+                else:
+                    with wave.open(file_path, "rb") as wav_file:
+                        duration = wav_file.getnframes() / wav_file.getframerate()
+            except Exception as e:
+                logger.warning("無法取得音檔長度 %s: %s", file_path, e)
+                return 0
+        
+        return duration
+    
+    def cache_audio_durations(self, durations_by_path):
+        """在主線程把讀取到的音檔長度存回檔案表（以路徑比對，批次期間列表順序可能已改變）"""
+        for i, file_path in enumerate(self.audio_files['path']):
+            duration = durations_by_path.get(file_path)
+            if duration:
+                self.audio_files['duration'][i] = duration
     
     def add_timestamps_to_text(self, text, start_time):
         """為文字添加時間戳"""
-        if not text or not self.enable_timestamps:
+        if not text:
             return text
         
         # 將文字分割成句子
@@ -495,6 +935,10 @@ class SpeechToTextApp:
         if not sentences:
             return text
         
+        # 只有一句時不需估算時間間隔
+        if len(sentences) == 1:
+            return f"{self.format_timestamp(start_time)} {sentences[0]}"
+        
         # 估算每個句子的時間間隔
         total_duration = self.get_estimated_speech_duration(text)
         if total_duration <= 0:
@@ -502,108 +946,104 @@ class SpeechToTextApp:
         
         time_per_sentence = total_duration / len(sentences)
         
-        # 為每個句子添加時間戳
-        timestamped_sentences = []
-        current_time = start_time
-        
-        for sentence in sentences:
-            if sentence.strip():  # 只處理非空句子
-                timestamp = self.format_timestamp(current_time)
-                timestamped_sentences.append(f"{timestamp} {sentence.strip()}")
-                current_time += time_per_sentence
-        
-        return "\n".join(timestamped_sentences)
+        # 為每個句子添加時間戳（split_into_sentences 已去除空白並濾掉空句子）
+        return "\n".join(
+            f"{self.format_timestamp(start_time + i * time_per_sentence)} {sentence}"
+            for i, sentence in enumerate(sentences)
+        )
     
     def split_into_sentences(self, text):
         """將文字分割成句子"""
-        import re
         # 使用正則表達式分割句子（支援中英文）
-        sentences = re.split(r'[。！？；.!?;]\s*', text)
+        sentences = SENTENCE_SPLIT_RE.split(text)
         # 過濾空句子
         return [s.strip() for s in sentences if s.strip()]
     
     def get_estimated_speech_duration(self, text):
         """估算語音持續時間（基於文字長度）"""
-        # 中文字符數 + 英文單詞數
-        chinese_chars = len([c for c in text if '\u4e00' <= c <= '\u9fff'])
-        english_words = len([w for w in text.split() if w.isalpha()])
+        key = hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest()
+        cached = self.duration_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        # 一次掃描同時取得中文字與英文單詞（英文單詞皆為ASCII，碼位小於中文字）
+        tokens = SPEECH_TOKEN_RE.findall(text)
+        chinese_chars = sum(1 for token in tokens if token >= '\u4e00')
+        english_words = len(tokens) - chinese_chars
         
         # 估算：中文約每分鐘200字，英文約每分鐘150詞
         chinese_duration = chinese_chars / 200 * 60  # 秒
         english_duration = english_words / 150 * 60  # 秒
         
-        return max(chinese_duration + english_duration, 10)  # 最少10秒
+        duration = max(chinese_duration + english_duration, 10)  # 最少10秒
+        self.duration_cache[key] = duration
+        return duration
     
-    def get_whisper_timestamps(self, audio_data, start_time=0):
-        """使用Whisper取得精確的時間戳"""
-        try:
-            if not self.whisper_model:
-                raise Exception("Whisper模型未載入")
-            
-            # 將AudioData轉換為臨時檔案
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-            temp_file_path = temp_file.name
-            self.temp_files.append(temp_file_path)
-            
+    def format_whisper_segments(self, segments, start_time=0):
+        """將Whisper的segments格式化為帶時間戳的文字"""
+        timestamped_text = []
+        for segment in segments:
+            text = segment["text"].strip()
+            if text:
+                timestamp = self.format_timestamp(start_time + segment["start"])
+                timestamped_text.append(f"{timestamp} {text}")
+        return "\n".join(timestamped_text)
+    
+    def decode_audio(self, file_path):
+        """使用ffmpeg將音檔解碼為16kHz單聲道16-bit PCM，直接由管線讀入記憶體並回傳AudioData"""
+        # 直接呼叫ffmpeg（沿用pydub設定的執行檔路徑），輸出原始PCM到stdout，不產生臨時WAV
+        result = subprocess.run(
+            [AudioSegment.converter, "-nostdin", "-i", file_path, "-vn",
+             "-ac", "1", "-ar", "16000", "-f", "s16le", "-"],
+            check=True,
+            capture_output=True
+        )
+        return sr.AudioData(result.stdout, 16000, 2)
+    
+    def load_audio_file(self, file_path):
+        """載入音檔為AudioData（16kHz單聲道的FLAC/OGG/WAV直接在程序內讀取，其餘經ffmpeg解碼並重新取樣）"""
+        file_ext = os.path.splitext(file_path)[1].lower()
+        if sf is not None and file_ext in SOUNDFILE_AUDIO_EXTENSIONS:
             try:
-                with open(temp_file_path, "wb") as f:
-                    f.write(audio_data.get_wav_data())
-                
-                # 使用Whisper轉換並取得segment資訊
-                language = self.language_var.get()
-                if language == "auto":
-                    result = self.whisper_model.transcribe(temp_file_path, word_timestamps=True)
-                else:
-                    lang_code = "zh" if language == "zh-TW" else "en"
-                    result = self.whisper_model.transcribe(temp_file_path, language=lang_code, word_timestamps=True)
-                
-                # 處理segments並添加起始時間偏移
-                timestamped_text = []
-                for segment in result.get("segments", []):
-                    segment_start = start_time + segment["start"]
-                    timestamp = self.format_timestamp(segment_start)
-                    text = segment["text"].strip()
-                    if text:
-                        timestamped_text.append(f"{timestamp} {text}")
-                
-                return "\n".join(timestamped_text)
-                
-            finally:
-                # 臨時檔案會在程式結束或重置時統一清理
-                pass
-                
-        except Exception as e:
-            print(f"Whisper時間戳轉換失敗: {e}")
-            # 如果Whisper失敗，回退到估算方法
-            text = self.perform_recognition(audio_data)
-            return self.add_timestamps_to_text(text, start_time)
+                audio_data = self.read_with_soundfile(file_path)
+            except Exception as e:
+                # libsndfile不支援的編碼（如較舊版本的Opus）改由ffmpeg處理
+                logger.debug("soundfile無法讀取 %s，改用ffmpeg: %s", file_path, e)
+                audio_data = None
+            return audio_data if audio_data is not None else self.decode_audio(file_path)
+        
+        if file_ext in FFMPEG_AUDIO_EXTENSIONS:
+            return self.decode_audio(file_path)
+        
+        audio_data = self.read_pcm_wav(file_path)
+        if audio_data is not None:
+            return audio_data
+        
+        # 其他取樣率或聲道數的WAV由ffmpeg以抗混疊濾波重新取樣，無法使用ffmpeg時才由AudioFile讀取
+        try:
+            return self.decode_audio(file_path)
+        except (OSError, subprocess.CalledProcessError) as e:
+            logger.debug("ffmpeg無法解碼 %s，改用AudioFile: %s", file_path, e)
+        with sr.AudioFile(file_path) as source:
+            return self.recognizer.record(source)
+    
+    def read_with_soundfile(self, file_path):
+        """以libsndfile在程序內解碼16kHz單聲道的檔案為16-bit PCM；需要重新取樣或混音時回傳None，交由ffmpeg處理"""
+        info = sf.info(file_path)
+        if info.samplerate != 16000 or info.channels != 1:
+            return None
+        samples, _ = sf.read(file_path, dtype="int16")
+        return sr.AudioData(samples.tobytes(), 16000, 2)
     
-    def load_audio_file_for_whisper(self, file_path):
-        """為Whisper載入音檔並轉換為AudioData格式"""
+    def read_pcm_wav(self, file_path):
+        """16kHz單聲道16-bit PCM的WAV（如本程式的錄音）一次讀入所有音框，不必重新取樣；其他格式回傳None"""
         try:
-            # 檢查檔案格式並轉換
-            file_ext = os.path.splitext(file_path)[1].lower()
-            
-            if file_ext in ['.mp3', '.mp4', '.m4a', '.flac', '.aac', '.ogg']:
-                # 使用pydub轉換為WAV格式
-                audio = AudioSegment.from_file(file_path)
-                
-                # 創建臨時WAV檔案
-                temp_wav = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-                temp_wav_path = temp_wav.name
-                self.temp_files.append(temp_wav_path)
-                audio.export(temp_wav_path, format="wav")
-                
-                # 載入轉換後的檔案
-                with sr.AudioFile(temp_wav_path) as source:
-                    return self.recognizer.record(source)
-            else:
-                # 直接載入WAV檔案
-                with sr.AudioFile(file_path) as source:
-                    return self.recognizer.record(source)
-                    
-        except Exception as e:
-            print(f"載入音檔失敗 {file_path}: {e}")
+            with wave.open(file_path, "rb") as wav_file:
+                if (wav_file.getnchannels() != 1 or wav_file.getsampwidth() != 2
+                        or wav_file.getframerate() != 16000 or wav_file.getcomptype() != "NONE"):
+                    return None
+                return sr.AudioData(wav_file.readframes(wav_file.getnframes()), 16000, 2)
+        except (wave.Error, EOFError):
             return None
     
     def add_audio_files(self):
@@ -620,38 +1060,155 @@ class SpeechToTextApp:
         )
         
         if file_paths:
-            # 新增檔案到列表
+            # 新增檔案到列表（每個欄位各自一個list）
             for file_path in file_paths:
-                file_info = {
-                    'path': file_path,
-                    'name': os.path.basename(file_path),
-                    'order': len(self.audio_files) + 1
-                }
-                self.audio_files.append(file_info)
+                order = self.get_audio_file_count() + 1
+                self.audio_files['path'].append(file_path)
+                self.audio_files['order'].append(order)
+                self.audio_files['duration'].append(None)
+                self.audio_files['name'].append(os.path.basename(file_path))
             
-            # 更新顯示
-            self.update_file_list()
+            # 更新顯示（只新增新的列）
+            self.append_file_rows(self.get_audio_file_count() - len(file_paths))
             messagebox.showinfo("成功", f"已新增 {len(file_paths)} 個音訊檔案")
     
+    def new_audio_file_table(self):
+        """建立空的音訊檔案表（欄位導向：每個欄位一個list）"""
+        return {'path': [], 'name': [], 'order': [], 'duration': []}
+    
+    def get_audio_file_count(self):
+        """取得音訊檔案數量"""
+        return len(self.audio_files['path'])
+    
+    def swap_audio_files(self, i, j):
+        """交換兩個音訊檔案的位置"""
+        for column in self.audio_files.values():
+            column[i], column[j] = column[j], column[i]
+    
     def clear_audio_files(self):
         """清空音訊檔案列表"""
-        self.audio_files = []
+        self.audio_files = self.new_audio_file_table()
         self.current_processing_index = 0
         self.update_file_list()
     
     def update_file_list(self):
         """更新檔案列表顯示"""
         # 清空現有項目
-        for item in self.file_tree.get_children():
-            self.file_tree.delete(item)
+        self.file_tree.delete(*self.file_tree.get_children())
+        
+        if self.is_file_list_virtual():
+            # 檔案數量龐大時只建立可見範圍的列，元件數量不隨檔案數成長
+            rows = self.get_visible_row_count()
+            self._tree_top = max(0, min(self._tree_top, self.get_audio_file_count() - rows))
+            visible_range = range(self._tree_top, min(self._tree_top + rows, self.get_audio_file_count()))
+        else:
+            self._tree_top = 0
+            visible_range = range(self.get_audio_file_count())
         
         # 新增檔案項目
-        for i, file_info in enumerate(self.audio_files):
-            self.file_tree.insert('', 'end', values=(
-                file_info['order'],
-                file_info['name'],
-                file_info['path']
-            ))
+        self._tree_ids = [self.insert_file_row(i) for i in visible_range]
+        
+        if self.is_file_list_virtual():
+            self.update_file_scrollbar()
+    
+    def insert_file_row(self, index):
+        """在檔案列表末端新增一列，回傳列ID"""
+        return self.file_tree.insert('', 'end', values=(
+            self.audio_files['order'][index],
+            self.audio_files['name'][index],
+            self.audio_files['path'][index]
+        ))
+    
+    def is_file_list_complete(self, row_count):
+        """檔案列表是否完整顯示了 row_count 個檔案（非虛擬列表模式）"""
+        return self._tree_top == 0 and len(self._tree_ids) == row_count
+    
+    def append_file_rows(self, start):
+        """只為新加入的檔案（索引 start 之後）新增列"""
+        if self.is_file_list_virtual() or not self.is_file_list_complete(start):
+            self.update_file_list()
+            return
+        
+        for i in range(start, self.get_audio_file_count()):
+            self._tree_ids.append(self.insert_file_row(i))
+    
+    def swap_file_rows(self, i, j):
+        """只搬移交換位置的兩列，不重建整個列表"""
+        if not self.is_file_list_complete(self.get_audio_file_count()):
+            self.update_file_list()
+            return
+        
+        ids = self._tree_ids
+        ids[i], ids[j] = ids[j], ids[i]
+        for k in sorted((i, j)):
+            self.file_tree.move(ids[k], '', k)
+            self.file_tree.set(ids[k], "順序", self.audio_files['order'][k])
+    
+    def delete_file_row(self, index):
+        """只刪除被移除檔案的那一列，並更新其後各列的順序號"""
+        if self.is_file_list_virtual() or not self.is_file_list_complete(self.get_audio_file_count() + 1):
+            self.update_file_list()
+            return
+        
+        self.file_tree.delete(self._tree_ids.pop(index))
+        for k in range(index, len(self._tree_ids)):
+            self.file_tree.set(self._tree_ids[k], "順序", self.audio_files['order'][k])
+    
+    def is_file_list_virtual(self):
+        """檔案數量是否已達虛擬列表模式"""
+        return self.get_audio_file_count() > VIRTUAL_LIST_THRESHOLD
+    
+    def get_visible_row_count(self):
+        """取得檔案列表可顯示的列數"""
+        return int(self.file_tree.cget("height"))
+    
+    def update_file_scrollbar(self):
+        """依虛擬列表的可見範圍更新捲軸位置"""
+        total = self.get_audio_file_count()
+        rows = self.get_visible_row_count()
+        self.file_scrollbar.set(self._tree_top / total, min(1.0, (self._tree_top + rows) / total))
+    
+    def on_file_tree_yscroll(self, first, last):
+        """Treeview的捲動回報（虛擬列表模式下改由程式計算）"""
+        if not self.is_file_list_virtual():
+            self.file_scrollbar.set(first, last)
+    
+    def scroll_file_list(self, *args):
+        """處理捲軸操作"""
+        if not self.is_file_list_virtual():
+            self.file_tree.yview(*args)
+            return
+        
+        if args[0] == "moveto":
+            top = int(float(args[1]) * self.get_audio_file_count())
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= self.get_visible_row_count()
+            top = self._tree_top + step
+        else:
+            return
+        self.set_file_list_top(top)
+    
+    def on_file_list_mousewheel(self, event):
+        """處理檔案列表的滑鼠滾輪"""
+        if not self.is_file_list_virtual():
+            return None  # 交由Treeview預設行為處理
+        
+        step = -3 if (event.num == 4 or event.delta > 0) else 3
+        self.set_file_list_top(self._tree_top + step)
+        return "break"
+    
+    def set_file_list_top(self, top):
+        """捲動虛擬列表至指定的第一列，並保留選取狀態"""
+        selected_index = self.get_selected_item()
+        self._tree_top = top
+        self.update_file_list()
+        
+        if selected_index is not None:
+            position = selected_index - self._tree_top
+            if 0 <= position < len(self._tree_ids):
+                self.file_tree.selection_set(self._tree_ids[position])
     
     def get_selected_item(self):
         """取得選中的項目索引"""
@@ -659,16 +1216,11 @@ class SpeechToTextApp:
         if not selection:
             return None
         
-        item = selection[0]
-        values = self.file_tree.item(item, 'values')
-        if not values:
+        # 列的位置加上可見範圍起點即為檔案索引
+        index = self.file_tree.index(selection[0]) + self._tree_top
+        if index >= self.get_audio_file_count():
             return None
-        
-        # 找到對應的檔案索引
-        for i, file_info in enumerate(self.audio_files):
-            if file_info['name'] == values[1] and file_info['path'] == values[2]:
-                return i
-        return None
+        return index
     
     def move_up(self):
         """上移選中檔案"""
@@ -677,12 +1229,11 @@ class SpeechToTextApp:
             return
         
         # 交換位置
-        self.audio_files[index], self.audio_files[index-1] = \
-            self.audio_files[index-1], self.audio_files[index]
+        self.swap_audio_files(index, index-1)
         
         # 更新順序號
         self.update_order_numbers()
-        self.update_file_list()
+        self.swap_file_rows(index, index-1)
         
         # 保持選中狀態
         self.select_item_by_index(index-1)
@@ -690,16 +1241,15 @@ class SpeechToTextApp:
     def move_down(self):
         """下移選中檔案"""
         index = self.get_selected_item()
-        if index is None or index == len(self.audio_files) - 1:
+        if index is None or index == self.get_audio_file_count() - 1:
             return
         
         # 交換位置
-        self.audio_files[index], self.audio_files[index+1] = \
-            self.audio_files[index+1], self.audio_files[index]
+        self.swap_audio_files(index, index+1)
         
         # 更新順序號
         self.update_order_numbers()
-        self.update_file_list()
+        self.swap_file_rows(index, index+1)
         
         # 保持選中狀態
         self.select_item_by_index(index+1)
@@ -712,75 +1262,120 @@ class SpeechToTextApp:
             return
         
         # 確認移除
-        file_name = self.audio_files[index]['name']
+        file_name = self.audio_files['name'][index]
         if messagebox.askyesno("確認", f"確定要移除檔案 '{file_name}' 嗎？"):
-            del self.audio_files[index]
+            for column in self.audio_files.values():
+                del column[index]
             self.update_order_numbers()
-            self.update_file_list()
+            self.delete_file_row(index)
     
     def update_order_numbers(self):
         """更新順序號"""
-        for i, file_info in enumerate(self.audio_files):
-            file_info['order'] = i + 1
+        self.audio_files['order'] = list(range(1, self.get_audio_file_count() + 1))
     
     def select_item_by_index(self, index):
         """根據索引選中項目"""
-        if 0 <= index < len(self.audio_files):
-            items = self.file_tree.get_children()
-            if index < len(items):
-                self.file_tree.selection_set(items[index])
-                self.file_tree.focus(items[index])
+        if 0 <= index < self.get_audio_file_count():
+            if self.is_file_list_virtual():
+                # 確保項目位於可見範圍內
+                rows = self.get_visible_row_count()
+                if index < self._tree_top or index >= self._tree_top + rows:
+                    self._tree_top = index - rows // 2
+                    self.update_file_list()
+            
+            position = index - self._tree_top
+            if 0 <= position < len(self._tree_ids):
+                self.file_tree.selection_set(self._tree_ids[position])
+                self.file_tree.focus(self._tree_ids[position])
+    
+    def get_batch_size(self):
+        """讀取批次大小設定（限制在1~32）"""
+        try:
+            batch_size = int(self.batch_size_var.get())
+        except (tk.TclError, ValueError):
+            batch_size = self.whisper_batch_size
+        return max(1, min(32, batch_size))
     
     def batch_convert_files(self):
         """批次轉換所有檔案"""
-        if not self.audio_files:
+        if not self.get_audio_file_count():
             messagebox.showwarning("警告", "請先新增音訊檔案")
             return
         
+        # 設定與檔案列表在主線程讀取，背景線程不直接存取Tk變數或檔案表（轉換期間列表仍可調整）
+        settings = self.snapshot_settings()
+        file_paths = list(self.audio_files['path'])
+        file_names = list(self.audio_files['name'])
+        cached_durations = list(self.audio_files['duration'])
+        
         # 在新線程中處理批次轉換
-        threading.Thread(target=self.process_batch_conversion, daemon=True).start()
+        self.progress.start(50)
+        threading.Thread(
+            target=self.process_batch_conversion,
+            args=(settings, file_paths, file_names, cached_durations),
+            daemon=True
+        ).start()
     
-    def process_batch_conversion(self):
-        """處理批次轉換"""
+    def process_batch_conversion(self, settings, file_paths, file_names, cached_durations):
+        """處理批次轉換（使用開始時的檔案列表快照）"""
         try:
             all_text = []
-            total_files = len(self.audio_files)
+            total_files = len(file_paths)
             self.total_elapsed_time = 0  # 重置累計時間
             
-            for i, file_info in enumerate(self.audio_files):
-                self.current_processing_index = i
+            self.post_status(f"正在處理 {total_files} 個檔案...")
+            
+            # 多個檔案同時載入與轉換：Whisper推論由whisper_lock依序執行，
+            # 其餘工作線程在等待期間先解碼後續檔案，推論完一個檔案時下一個通常已解碼完成
+            texts = [None] * total_files
+            segments = [None] * total_files
+            decoded_durations = [None] * total_files  # 解碼後的實際長度，時間戳偏移以此為準
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.batch_workers) as executor:
+                def probe_duration(i):
+                    # 尚未快取長度的檔案才讀取檔頭
+                    if cached_durations[i] is not None:
+                        return cached_durations[i]
+                    return self.get_audio_duration(file_paths[i])
                 
-                # 更新狀態
-                status_text = f"正在處理檔案 {i+1}/{total_files}: {file_info['name']}"
-                self.root.after(0, self.update_record_status, status_text)
+                durations = list(executor.map(probe_duration, range(total_files)))
                 
-                # 載入並轉換檔案
-                text = self.convert_single_file(file_info['path'])
+                # 依長度由短到長送出，長度相近的檔案接連推論（結果仍依檔案順序組合）
+                processing_order = sorted(range(total_files), key=durations.__getitem__)
+                futures = {executor.submit(self.convert_single_file, file_paths[i], settings): i for i in processing_order}
                 
-                # 取得檔案持續時間並累加
-                file_duration = self.get_audio_duration(file_info['path'])
+                for done_count, future in enumerate(concurrent.futures.as_completed(futures), 1):
+                    i = futures[future]
+                    texts[i], segments[i], decoded_durations[i] = future.result()
+                    self.current_processing_index = i
+                    
+                    # 更新狀態
+                    status_text = f"已完成 {done_count}/{total_files}: {file_names[i]}"
+                    self.post_status(status_text)
+            
+            # 容器記錄的長度可能只是估計值（例如沒有Xing檔頭的VBR MP3），有解碼結果時改用實際長度
+            for i, decoded_duration in enumerate(decoded_durations):
+                if decoded_duration is not None:
+                    durations[i] = decoded_duration
+            self.root.after(0, self.cache_audio_durations, dict(zip(file_paths, durations)))
+            
+            # 依檔案順序組合結果並累加起始時間
+            for i in range(total_files):
+                file_name = file_names[i]
+                text = texts[i]
+                file_duration = durations[i]
                 
                 if text:
                     # 新增檔案標題
-                    section_title = f"\n{'='*50}\n檔案 {i+1}: {file_info['name']}"
-                    if self.enable_timestamps:
+                    section_title = f"\n{'='*50}\n檔案 {i+1}: {file_name}"
+                    if settings.enable_timestamps:
                         section_title += f" (起始時間: {self.format_timestamp(self.total_elapsed_time)})"
                     section_title += f"\n{'='*50}\n"
                     
                     # 處理文字和時間戳
-                    if self.enable_timestamps:
-                        # 如果使用Whisper引擎，嘗試使用精確時間戳
-                        if self.engine_var.get() == "whisper":
-                            try:
-                                # 重新載入檔案並取得精確時間戳
-                                audio_data = self.load_audio_file_for_whisper(file_info['path'])
-                                if audio_data:
-                                    formatted_text = self.get_whisper_timestamps(audio_data, self.total_elapsed_time)
-                                else:
-                                    formatted_text = self.add_timestamps_to_text(text, self.total_elapsed_time)
-                            except Exception as e:
-                                print(f"Whisper時間戳失敗，使用估算: {e}")
-                                formatted_text = self.add_timestamps_to_text(text, self.total_elapsed_time)
+                    if settings.enable_timestamps:
+                        if segments[i] is not None:
+                            # Whisper轉換時已一併取得精確時間戳
+                            formatted_text = self.format_whisper_segments(segments[i], self.total_elapsed_time)
                         else:
                             formatted_text = self.add_timestamps_to_text(text, self.total_elapsed_time)
                         
@@ -789,7 +1384,7 @@ class SpeechToTextApp:
                         all_text.append(section_title + text)
                 else:
                     # 轉換失敗的情況
-                    error_text = f"\n{'='*50}\n檔案 {i+1}: {file_info['name']}\n{'='*50}\n[轉換失敗]\n"
+                    error_text = f"\n{'='*50}\n檔案 {i+1}: {file_name}\n{'='*50}\n[轉換失敗]\n"
                     all_text.append(error_text)
                 
                 # 累加時間到下一個檔案
@@ -797,48 +1392,35 @@ class SpeechToTextApp:
             
             # 合併所有文字並顯示
             final_text = "\n".join(all_text)
-            self.root.after(0, self.safe_update_result, final_text)
-            self.root.after(0, self.update_record_status, f"批次轉換完成 ({total_files} 個檔案)")
+            self.post_result(final_text)
+            self.post_status(f"批次轉換完成 ({total_files} 個檔案)")
             
         except Exception as e:
             error_text = f"批次轉換失敗: {e}"
-            self.root.after(0, self.update_record_status, error_text)
-            print(error_text)
+            self.post_status(error_text)
+            logger.warning(error_text)
+        finally:
+            self.root.after(0, self.progress.stop)
     
-    def convert_single_file(self, file_path):
-        """轉換單一檔案為文字"""
+    def convert_single_file(self, file_path, settings):
+        """轉換單一檔案為文字，回傳 (文字, Whisper segments或None, 解碼後的長度（秒）或None)"""
         try:
-            # 載入音訊檔案
-            file_ext = os.path.splitext(file_path)[1].lower()
-            
-            if file_ext in ['.mp3', '.mp4', '.m4a', '.flac', '.aac', '.ogg']:
-                # 使用pydub轉換為WAV格式
-                audio = AudioSegment.from_file(file_path)
-                
-                # 創建臨時WAV檔案
-                temp_wav = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-                temp_wav_path = temp_wav.name
-                self.temp_files.append(temp_wav_path)
-                audio.export(temp_wav_path, format="wav")
-                
-                # 載入轉換後的檔案
-                with sr.AudioFile(temp_wav_path) as source:
-                    audio_data = self.recognizer.record(source)
-            else:
-                # 直接載入WAV檔案
-                with sr.AudioFile(file_path) as source:
-                    audio_data = self.recognizer.record(source)
+            # 載入音訊檔案（解碼結果直接留在記憶體）
+            audio_data = self.load_audio_file(file_path)
+            duration = len(audio_data.frame_data) / (audio_data.sample_rate * audio_data.sample_width)
             
-            # 進行語音識別
-            return self.perform_recognition(audio_data)
+            # 進行語音識別（可用時以批次管線推論）
+            text, segments = self.recognize_with_segments(audio_data, settings, batched=True)
+            return text, segments, duration
             
         except Exception as e:
-            print(f"轉換檔案 {file_path} 失敗: {e}")
-            return None
+            logger.warning("轉換檔案 %s 失敗: %s", file_path, e)
+            return None, None, None
     
     def continuous_recording(self):
         """連續錄音模式"""
         segment_count = 0
+        live_queue = self.live_queue  # 本次錄音的轉換佇列（下一次錄音會換成新的佇列）
         while self.is_recording:
             # 如果暫停，則等待
             if self.is_paused:
@@ -857,6 +1439,8 @@ class SpeechToTextApp:
                     # 檢查是否還在錄音且未暫停
                     if self.is_recording and not self.is_paused:
                         self.recording_segments.append(audio)
+                        if live_queue is not None:
+                            live_queue.put(audio)
                         segment_count += 1
                         
                         # 更新狀態
@@ -866,19 +1450,104 @@ class SpeechToTextApp:
                             elapsed_time -= current_pause
                         
                         status_text = f"錄音中... {segment_count}段 (有效時間: {elapsed_time:.1f}秒)"
-                        self.root.after(0, self.update_record_status, status_text)
+                        self.post_status(status_text)
                     
             except sr.WaitTimeoutError:
                 # 超時時繼續等待，不結束錄音
                 continue
             except Exception as e:
                 if self.is_recording:  # 只在仍在錄音時顯示錯誤
-                    print(f"錄音段落錯誤: {e}")
+                    logger.warning("錄音段落錯誤: %s", e)
                 continue
         
+        # 通知背景轉換已沒有新的段落
+        if live_queue is not None:
+            live_queue.put(None)
+        
         # 合併所有錄音段落
         if self.recording_segments:
             self.merge_audio_segments()
+            self.live_audio = self.audio_data
+    
+    def start_live_transcription(self):
+        """啟動錄音期間的逐段轉換（設定在主線程讀取）"""
+        self.live_queue = queue.Queue()
+        self.live_results = []
+        self.live_settings = self.snapshot_settings()
+        self.live_audio = None
+        self.live_cancel = threading.Event()
+        self.live_thread = threading.Thread(
+            target=self.live_transcription_worker,
+            args=(self.live_queue, self.live_results, self.live_settings, self.live_cancel),
+            daemon=True
+        )
+        self.live_thread.start()
+    
+    def stop_live_transcription(self):
+        """停止目前的逐段轉換工作，之後它不再更新結果顯示"""
+        if self.live_cancel is not None:
+            self.live_cancel.set()
+        if self.live_queue is not None:
+            self.live_queue.put(None)
+        self.live_queue = None
+        self.live_cancel = None
+    
+    def live_transcription_worker(self, segment_queue, results, settings, cancel):
+        """逐段轉換錄好的段落並即時顯示，結束錄音時大部分轉換已完成（cancel設定後即停止）"""
+        offset = 0  # 段落在合併後錄音中的起始秒數
+        has_partial_text = False
+        while not cancel.is_set():
+            audio = segment_queue.get()
+            if audio is None:
+                break
+            
+            failed = False
+            try:
+                text, segments = self.recognize_with_segments(audio, settings, raise_errors=True)
+            except sr.UnknownValueError:
+                # 這一段沒有可識別的語音
+                text, segments = None, None
+            except Exception as e:
+                # 網路或模型錯誤：記下失敗，轉換時改為完整轉換整段錄音
+                logger.warning("段落轉換失敗: %s", e)
+                text, segments, failed = None, None, True
+            results.append((text, segments, offset, failed))
+            offset += len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+            
+            if cancel.is_set():
+                break
+            if text:
+                # 第一段取代原有內容，之後的段落只附加在末端
+                if has_partial_text:
+                    self.post_result_append("\n" + text.strip())
+                else:
+                    self.post_result(text.strip())
+                    has_partial_text = True
+    
+    def get_live_transcription(self, settings):
+        """目前的錄音若已在錄音期間以相同設定轉換，等待剩餘段落完成後回傳結果，否則回傳None"""
+        if self.live_audio is None:
+            return None
+        if self.live_audio is not self.audio_data or self.live_settings != settings:
+            # 錄音或設定已改變，停止舊的轉換工作，避免它覆寫完整轉換的結果
+            self.stop_live_transcription()
+            return None
+        
+        self.live_thread.join()
+        if any(failed for _, _, _, failed in self.live_results):
+            return None
+        
+        parts = []
+        for text, segments, offset, _ in self.live_results:
+            if not text:
+                continue
+            if not settings.enable_timestamps:
+                parts.append(text.strip())
+            elif segments is not None:
+                parts.append(self.format_whisper_segments(segments, offset))
+            else:
+                parts.append(self.add_timestamps_to_text(text, offset))
+        return "\n".join(parts) or None
     
     def single_recording(self):
         """單句錄音模式"""
@@ -903,7 +1572,7 @@ class SpeechToTextApp:
                 
         except sr.WaitTimeoutError:
             if self.is_recording:  # 只在仍在錄音時顯示超時
-                self.root.after(0, self.update_record_status, "錄音超時")
+                self.post_status("錄音超時")
                 self.root.after(0, self.stop_recording)
     
     def merge_audio_segments(self):
@@ -914,80 +1583,36 @@ class SpeechToTextApp:
             
             if len(self.recording_segments) == 1:
                 self.audio_data = self.recording_segments[0]
-                self.root.after(0, self.update_record_status, "錄音完成")
+                self.post_status("錄音完成")
                 return
             
-            # 創建臨時文件來合併音訊
-            temp_files = []
+            # 所有段落來自同一支麥克風，直接串接原始PCM資料
+            # （一次配置完成，避免 AudioSegment += 每段都重新複製整段緩衝區）
+            first_segment = self.recording_segments[0]
+            sample_rate = first_segment.sample_rate
+            sample_width = first_segment.sample_width
+            raw_data = b"".join(
+                segment.get_raw_data(convert_rate=sample_rate, convert_width=sample_width)
+                for segment in self.recording_segments
+            )
             
-            # 將每個段落保存為臨時文件
-            for i, segment in enumerate(self.recording_segments):
-                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=f"_segment_{i}.wav")
-                try:
-                    with open(temp_file.name, "wb") as f:
-                        f.write(segment.get_wav_data())
-                    temp_files.append(temp_file.name)
-                    self.temp_files.append(temp_file.name)  # 追蹤臨時檔案
-                except Exception as e:
-                    print(f"保存段落 {i} 失敗: {e}")
-                    continue
-            
-            if not temp_files:
-                print("沒有有效的音訊段落")
+            if not raw_data:
+                logger.warning("合併後音訊為空")
                 return
             
-            # 使用pydub合併音訊
-            combined = AudioSegment.empty()
-            for temp_file in temp_files:
-                try:
-                    segment_audio = AudioSegment.from_wav(temp_file)
-                    combined += segment_audio
-                except Exception as e:
-                    print(f"載入段落失敗: {e}")
-                    continue
-            
-            if len(combined) == 0:
-                print("合併後音訊為空")
-                return
+            # 直接以原始PCM建立AudioData，不需再編碼成WAV後重新解析
+            self.audio_data = sr.AudioData(raw_data, sample_rate, sample_width)
             
-            # 保存合併結果
-            final_temp = tempfile.NamedTemporaryFile(delete=False, suffix="_combined.wav")
-            final_temp_path = final_temp.name
-            self.temp_files.append(final_temp_path)  # 追蹤臨時檔案
+            logger.debug("已合併 %s 個錄音段落", len(self.recording_segments))
+            status_text = f"錄音完成 (合併了{len(self.recording_segments)}段)"
+            self.post_status(status_text)
             
-            try:
-                combined.export(final_temp_path, format="wav")
-                
-                # 載入合併後的音訊
-                with sr.AudioFile(final_temp_path) as source:
-                    self.audio_data = self.recognizer.record(source)
-                
-                print(f"已合併 {len(self.recording_segments)} 個錄音段落")
-                status_text = f"錄音完成 (合併了{len(self.recording_segments)}段)"
-                self.root.after(0, self.update_record_status, status_text)
-                
-            except Exception as e:
-                print(f"合併最終處理失敗: {e}")
-                # 如果合併失敗，使用第一個段落
-                if self.recording_segments:
-                    self.audio_data = self.recording_segments[0]
-                    self.root.after(0, self.update_record_status, "錄音完成（使用第一段）")
-            
-            # 清理段落臨時文件（保留最終合併檔案供後續使用）
-            for temp_file in temp_files:
-                try:
-                    os.unlink(temp_file)
-                    if temp_file in self.temp_files:
-                        self.temp_files.remove(temp_file)
-                except:
-                    pass
-                    
         except Exception as e:
-            print(f"合併音訊失敗: {e}")
+            logger.warning("合併音訊失敗: %s", e)
             # 如果合併失敗，使用第一個段落
             if self.recording_segments:
                 self.audio_data = self.recording_segments[0]
-                self.root.after(0, self.update_record_status, "錄音完成（合併失敗，使用第一段）")
+                self.post_status("錄音完成（合併失敗，使用第一段）")
     
     def upload_audio_file(self):
         """上傳音訊檔案"""
@@ -1007,92 +1632,96 @@ class SpeechToTextApp:
             
             # 載入音訊檔案
             try:
-                # 檢查檔案格式並轉換
-                file_ext = os.path.splitext(file_path)[1].lower()
-                
-                if file_ext in ['.mp3', '.mp4', '.m4a', '.flac', '.aac', '.ogg']:
-                    # 使用pydub轉換為WAV格式
-                    audio = AudioSegment.from_file(file_path)
-                    
-                    # 創建臨時WAV檔案
-                    temp_wav = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-                    temp_wav_path = temp_wav.name
-                    self.temp_files.append(temp_wav_path)  # 追蹤臨時檔案
-                    audio.export(temp_wav_path, format="wav")
-                    
-                    # 載入轉換後的檔案
-                    with sr.AudioFile(temp_wav_path) as source:
-                        self.audio_data = self.recognizer.record(source)
-                    
-                else:
-                    # 直接載入WAV檔案
-                    with sr.AudioFile(file_path) as source:
-                        self.audio_data = self.recognizer.record(source)
+                # 依檔案格式解碼或直接載入
+                self.audio_data = self.load_audio_file(file_path)
                 
                 messagebox.showinfo("成功", "音訊檔案載入成功")
                 
             except Exception as e:
                 messagebox.showerror("錯誤", f"載入音訊檔案失敗: {e}")
-                print(f"詳細錯誤信息: {e}")
+                logger.warning("詳細錯誤信息: %s", e)
     
     def convert_speech_to_text(self):
         """轉換語音為文字"""
         # 檢查是否有錄音數據或檔案列表
-        if not self.audio_data and not self.audio_files:
+        if not self.audio_data and not self.get_audio_file_count():
             messagebox.showwarning("警告", "請先錄音或新增音訊檔案")
             return
         
         self.text_result.delete(1.0, tk.END)
         
-        if self.audio_files:
+        if self.get_audio_file_count():
             # 如果有檔案列表，執行批次轉換
             self.text_result.insert(tk.END, "開始批次轉換...\n")
             self.batch_convert_files()
         elif self.audio_data:
             # 如果只有錄音數據，執行單一轉換
             self.text_result.insert(tk.END, "正在轉換錄音中，請稍候...\n")
-            self.root.update()
-            threading.Thread(target=self.perform_single_conversion, daemon=True).start()
+            self.text_result.update_idletasks()
+            self.progress.start(50)
+            settings = self.snapshot_settings()
+            threading.Thread(target=self.perform_single_conversion, args=(settings,), daemon=True).start()
+    
+    def snapshot_settings(self):
+        """在主線程讀取目前的識別設定"""
+        language = self.language_var.get()
+        return RecognitionSettings(
+            engine=self.engine_var.get(),
+            language=language,
+            enable_timestamps=self.enable_timestamps,
+            lang_code=None if language == "auto" else ("zh" if language == "zh-TW" else "en"),
+            fast_mode=self.fast_mode_var.get(),
+            batch_size=self.get_batch_size()
+        )
     
-    def perform_single_conversion(self):
+    def perform_single_conversion(self, settings):
         """執行單一音訊轉換"""
         try:
-            text = self.perform_recognition(self.audio_data)
+            # 錄音期間已逐段轉換完成時直接使用結果
+            live_text = self.get_live_transcription(settings)
+            if live_text:
+                self.post_result(live_text)
+                self.post_status("轉換完成")
+                return
+            
+            text, segments = self.recognize_with_segments(self.audio_data, settings)
             if text:
-                # 如果啟用時間戳，添加時間戳
-                if self.enable_timestamps:
-                    # 如果使用Whisper引擎，使用精確時間戳
-                    if self.engine_var.get() == "whisper":
-                        try:
-                            formatted_text = self.get_whisper_timestamps(self.audio_data, 0)
-                        except Exception as e:
-                            print(f"Whisper時間戳失敗，使用估算: {e}")
-                            formatted_text = self.add_timestamps_to_text(text, 0)
+                # 如果啟用時間戳，添加時間戳（錄音從0開始）
+                if settings.enable_timestamps:
+                    if segments is not None:
+                        # Whisper轉換時已一併取得精確時間戳
+                        formatted_text = self.format_whisper_segments(segments, 0)
                     else:
-                        formatted_text = self.add_timestamps_to_text(text, 0)  # 錄音從0開始
+                        formatted_text = self.add_timestamps_to_text(text, 0)
                     
-                    self.root.after(0, self.safe_update_result, formatted_text)
+                    self.post_result(formatted_text)
                 else:
-                    self.root.after(0, self.safe_update_result, text)
-                self.root.after(0, self.update_record_status, "轉換完成")
+                    self.post_result(text)
+                self.post_status("轉換完成")
             else:
-                self.root.after(0, self.safe_update_result, "轉換失敗")
-                self.root.after(0, self.update_record_status, "轉換失敗")
+                self.post_result("轉換失敗")
+                self.post_status("轉換失敗")
                 
         except Exception as e:
             error_text = f"轉換失敗: {e}"
-            self.root.after(0, self.safe_update_result, error_text)
-            self.root.after(0, self.update_record_status, error_text)
-            print(error_text)
-            self.root.after(0, self.safe_update_result, error_text)
-            self.root.after(0, self.update_record_status, error_text)
-            print(error_text)
-    
-    def perform_recognition(self, audio_data):
-        """執行語音識別並返回文字"""
+            self.post_result(error_text)
+            self.post_status(error_text)
+            logger.warning(error_text)
+        finally:
+            self.root.after(0, self.progress.stop)
+    
+    def recognize_with_segments(self, audio_data, settings, batched=False, raise_errors=False):
+        """執行語音識別，回傳 (文字, Whisper segments或None)"""
+        result = self.perform_recognition(audio_data, settings, return_segments=True, batched=batched, raise_errors=raise_errors)
+        if isinstance(result, dict):
+            return result["text"], result.get("segments", [])
+        return result, None
+    
+    def perform_recognition(self, audio_data, settings, return_segments=False, batched=False, raise_errors=False):
+        """執行語音識別並返回文字（return_segments時Whisper回傳含segments的完整結果，batched時使用批次管線，raise_errors時失敗不回傳None而是拋出例外）"""
         try:
-            engine = self.engine_var.get()
-            language = self.language_var.get()
+            engine = settings.engine
+            language = settings.language
             
             if engine == "google":
                 # 使用Google語音識別
@@ -1102,52 +1731,39 @@ class SpeechToTextApp:
                     return self.recognizer.recognize_google(audio_data, language=language)
             
             elif engine == "whisper":
-                # 使用Whisper語音識別
+                # 使用Whisper語音識別（模型仍在背景載入時等待完成）
+                if self.whisper_future is not None:
+                    self.whisper_future.result()
                 if not self.whisper_model:
                     raise Exception("Whisper模型未載入")
                 
-                # 將AudioData轉換為臨時檔案
-                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-                temp_file_path = temp_file.name
-                self.temp_files.append(temp_file_path)
+                # 將AudioData直接轉換為陣列，不經過臨時檔案
+                audio = self.audio_data_to_array(audio_data)
+                model = self.select_whisper_model(audio, settings)
                 
-                try:
-                    with open(temp_file_path, "wb") as f:
-                        f.write(audio_data.get_wav_data())
+                # 使用Whisper轉換
+                if settings.enable_timestamps:
+                    # 啟用時間戳時，取得詳細的segment資訊（保留原始長度以免時間偏移）
+                    result = self.transcribe_with_whisper(audio, settings.lang_code, word_timestamps=True, batched=batched, model=model, batch_size=settings.batch_size)
                     
-                    # 使用Whisper轉換
-                    if self.enable_timestamps:
-                        # 啟用時間戳時，取得詳細的segment資訊
-                        if language == "auto":
-                            result = self.whisper_model.transcribe(temp_file_path, word_timestamps=True)
-                        else:
-                            lang_code = "zh" if language == "zh-TW" else "en"
-                            result = self.whisper_model.transcribe(temp_file_path, language=lang_code, word_timestamps=True)
-                        
-                        # 如果是批次轉換的一部分，返回帶有segment資訊的結果
-                        if hasattr(self, '_return_segments') and self._return_segments:
-                            return result
-                        else:
-                            return result["text"]
+                    # 呼叫端需要時間戳時直接回傳segments，不必再轉換一次
+                    if return_segments:
+                        return result
                     else:
-                        # 一般轉換
-                        if language == "auto":
-                            result = self.whisper_model.transcribe(temp_file_path)
-                        else:
-                            lang_code = "zh" if language == "zh-TW" else "en"
-                            result = self.whisper_model.transcribe(temp_file_path, language=lang_code)
-                        
                         return result["text"]
-                
-                finally:
-                    # 清理臨時檔案會在程式結束或重置時統一處理
-                    pass
+                else:
+                    # 一般轉換：先縮短過長的靜音，減少Whisper運算量
+                    result = self.transcribe_with_whisper(remove_long_silences(audio), settings.lang_code, batched=batched, model=model, batch_size=settings.batch_size)
+                    
+                    return result["text"]
             
             else:
                 raise Exception(f"不支援的識別引擎: {engine}")
                 
         except Exception as e:
-            print(f"語音識別失敗: {e}")
+            if raise_errors:
+                raise
+            logger.warning("語音識別失敗: %s", e)
             return None
     
     def update_result(self, text):
@@ -1168,12 +1784,11 @@ class SpeechToTextApp:
         )
         
         if file_path:
+            exported_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             try:
+                header = f"語音轉文字結果\n轉換時間: {exported_at}\n{'-' * 50}\n"
                 with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(f"語音轉文字結果\n")
-                    f.write(f"轉換時間: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                    f.write("-" * 50 + "\n")
-                    f.write(content)
+                    f.write(header + content)
                 messagebox.showinfo("成功", f"已成功導出至: {file_path}")
             except Exception as e:
                 messagebox.showerror("錯誤", f"導出失敗: {e}")
@@ -1192,19 +1807,42 @@ class SpeechToTextApp:
         )
         
         if file_path:
+            exported_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             try:
                 doc = Document()
                 doc.add_heading('語音轉文字結果', 0)
-                doc.add_paragraph(f'轉換時間: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}')
+                doc.add_paragraph(f'轉換時間: {exported_at}')
                 doc.add_paragraph('-' * 50)
-                doc.add_paragraph(content)
+                # 每行一個段落，避免整份逐字稿塞進單一超大段落
+                self.append_docx_lines(doc, content.split('\n'))
                 doc.save(file_path)
                 messagebox.showinfo("成功", f"已成功導出至: {file_path}")
             except Exception as e:
                 messagebox.showerror("錯誤", f"導出失敗: {e}")
 
+    def append_docx_lines(self, doc, lines):
+        """每行建立一個段落，直接產生<w:p>元素並一次插入文件，略過python-docx逐段建立Paragraph物件的成本"""
+        body = doc.element.body
+        paragraphs = []
+        for line in lines:
+            paragraph = OxmlElement('w:p')
+            if line:
+                run = OxmlElement('w:r')
+                text = OxmlElement('w:t')
+                text.text = line
+                text.set(qn('xml:space'), 'preserve')  # 保留行首行尾空白
+                run.append(text)
+                paragraph.append(run)
+            paragraphs.append(paragraph)
+        
+        # 段落需位於文件結尾的節屬性(sectPr)之前
+        sect_pr = body.sectPr
+        position = body.index(sect_pr) if sect_pr is not None else len(body)
+        body[position:position] = paragraphs
+
 def main():
     """主函數"""
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
     root = tk.Tk()
     app = SpeechToTextApp(root)
     root.mainloop()
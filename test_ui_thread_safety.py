@@ -40,6 +40,13 @@ def test_ui_thread_safety():
             except Exception as e:
                 print(f"更新結果失敗: {e}")
         
+        def safe_append_result(text):
+            """安全地在結果末端附加文字（不需讀回整個文字框內容）"""
+            try:
+                result_text.insert(tk.END, text)
+            except Exception as e:
+                print(f"更新結果失敗: {e}")
+        
         def background_task():
             """在背景執行的任務"""
             for i in range(5):
@@ -52,10 +59,8 @@ def test_ui_thread_safety():
                 
                 time.sleep(1)
                 
-                result_text = f"完成步驟 {i+1}\n"
-                root.after(0, lambda text=result_text: safe_update_result(
-                    result_text.get(1.0, tk.END) + text
-                ))
+                step_text = f"完成步驟 {i+1}\n"
+                root.after(0, safe_append_result, step_text)
             
             # 最終更新
             root.after(0, safe_update_status, "測試完成！")
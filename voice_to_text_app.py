@@ -27,9 +27,12 @@ class BasicSpeechToTextApp:
         
         # 初始化變數
         self.audio_data = None
+        self.ambient_calibrated = False  # 是否已校準環境噪音
+        self.energy_threshold = None  # 校準後的能量門檻，之後錄音直接沿用
         
         if SPEECH_RECOGNITION_AVAILABLE:
             self.recognizer = sr.Recognizer()
+            self.recognizer.operation_timeout = 15  # Google識別請求逾時（秒），避免網路異常時轉換無限期等待
             try:
                 self.microphone = sr.Microphone()
                 self.mic_available = True
@@ -76,6 +79,8 @@ class BasicSpeechToTextApp:
             self.record_status = ttk.Label(record_frame, text="準備錄音")
             self.record_status.grid(row=0, column=1)
             
+            ttk.Button(record_frame, text="重新校準麥克風", command=self.recalibrate_microphone).grid(row=0, column=2, padx=(10, 0))
+            
             ttk.Label(record_frame, text="提示：點擊錄音後請在10秒內說話", font=("Arial", 8)).grid(row=1, column=0, columnspan=2, pady=(5, 0))
         
         # 檔案上傳區域
@@ -148,7 +153,11 @@ class BasicSpeechToTextApp:
         def record():
             try:
                 with self.microphone as source:
-                    self.recognizer.adjust_for_ambient_noise(source, duration=1)
+                    if self.ambient_calibrated:
+                        # 沿用先前校準的門檻，不必每次先花1秒聆聽環境噪音
+                        self.recognizer.energy_threshold = self.energy_threshold
+                    else:
+                        self.calibrate_ambient_noise(source)
                     audio = self.recognizer.listen(source, timeout=15, phrase_time_limit=10)
                     self.audio_data = audio
                     self.root.after(0, self.record_complete)
@@ -159,6 +168,17 @@ class BasicSpeechToTextApp:
         
         threading.Thread(target=record, daemon=True).start()
     
+    def calibrate_ambient_noise(self, source, duration=1):
+        """聆聽環境噪音並記下能量門檻，之後的錄音直接沿用"""
+        self.recognizer.adjust_for_ambient_noise(source, duration=duration)
+        self.energy_threshold = self.recognizer.energy_threshold
+        self.ambient_calibrated = True
+    
+    def recalibrate_microphone(self):
+        """下次錄音時重新校準環境噪音（更換環境時使用）"""
+        self.ambient_calibrated = False
+        self.record_status.config(text="下次錄音時將重新校準麥克風")
+    
     def record_complete(self):
         """錄音完成"""
         self.record_status.config(text="錄音完成！")
@@ -217,17 +237,20 @@ class BasicSpeechToTextApp:
         self.text_result.insert(tk.END, "🔄 正在轉換中，請稍候...\n\n")
         self.text_result.insert(tk.END, "提示：首次使用可能需要下載語音模型，請耐心等待。")
         self.convert_button.config(state="disabled", text="轉換中...")
-        self.root.update()
+        self.text_result.update_idletasks()
         
         def convert():
             try:
                 language = self.language_var.get()
                 text = self.recognizer.recognize_google(self.audio_data, language=language)
                 
-                # 格式化結果
-                result = f"📝 轉換結果：\n\n{text}\n\n"
-                result += f"🌐 使用語言：{language}\n"
-                result += f"⏰ 轉換時間：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+                # 格式化結果（一次組成整段文字）
+                converted_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                result = (
+                    f"📝 轉換結果：\n\n{text}\n\n"
+                    f"🌐 使用語言：{language}\n"
+                    f"⏰ 轉換時間：{converted_at}"
+                )
                 
                 self.root.after(0, lambda: self.show_result(result, True))
                 